@@ -2,16 +2,14 @@ from __future__ import print_function
 
 import os
 import re
-import pause
-import datetime
 from six.moves import urllib
 
 from format import Formatter
 from conference import MONTHS
+from scheduler import default_scheduler
 
 class Builder(Formatter):
 
-    TIME_INTERVAL = 1
     LEVELS = ["*", "=", "-", "+", "^"]
     INVALID_FILE_NAME = re.compile("[^-a-zA-Z0-9_.() ]+")
     HEADER = \
@@ -29,13 +27,13 @@ class Builder(Formatter):
 .. role:: keywords(emphasis)
 """
 
-    def __init__(self, title="Paper list", description=""):
+    def __init__(self, title="Paper list", description="", scheduler=None):
         super(Builder, self).__init__()
         self.title = title
         self.description = description
         self.key_pattern = re.compile(":(\w+):`([^`]*?)`")
         self.separator = re.compile("[, ]+")
-        self.last_request = datetime.datetime.now()
+        self.scheduler = scheduler or default_scheduler
         self.papers = []
 
     def load(self, file_name):
@@ -97,18 +95,23 @@ class Builder(Formatter):
         count = 0
         if not os.path.exists(path):
             os.mkdir(path)
+        requests = []
+        download_files = set()
         for paper in self.papers:
             if "pdf" in paper:
                 download_file = self.INVALID_FILE_NAME.sub("", paper["title"] + ".pdf")
                 download_file = os.path.join(path, download_file)
-                if not os.path.exists(download_file):
-                    pause.until(self.last_request + datetime.timedelta(seconds=self.TIME_INTERVAL))
-                    try:
-                        urllib.request.urlretrieve(paper["pdf"], download_file)
-                        count += 1
-                    except:
-                        self.logger.info("Can't download %s" % paper["pdf"])
-                    self.last_request = datetime.datetime.now()
+                if not os.path.exists(download_file) and download_file not in download_files:
+                    download_files.add(download_file)
+                    request = self.scheduler.submit(paper["pdf"], urllib.request.urlretrieve,
+                                                    paper["pdf"], download_file)
+                    requests.append((paper["pdf"], request))
+        for pdf, request in requests:
+            try:
+                request.result()
+                count += 1
+            except:
+                self.logger.info("Can't download %s" % pdf)
         self.logger.info("Downloaded %d papers" % count)
 
     def build(self, file_name, index="venue"):
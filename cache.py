@@ -0,0 +1,293 @@
+from __future__ import print_function
+
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import argparse
+import threading
+import tempfile
+from stat import S_ISREG
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class PageCache(object):
+
+    LOCK_DIR = ".locks"
+    TEMP_SUFFIX = ".tmp"
+    STATS_FILE = "stats.json"
+    MAX_SIZE = 2 ** 30
+
+    def __init__(self, path="cache/", max_size=None):
+        self.path = path
+        self.max_size = max_size
+        self.lock_path = os.path.join(self.path, self.LOCK_DIR)
+        self.stats_file = os.path.join(self.lock_path, self.STATS_FILE)
+        self.logger = logging.getLogger("%s.%s" % (self.__module__, self.__class__.__name__))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.pending = {"hits": 0, "misses": 0, "evictions": 0}
+        self.counter_lock = threading.Lock()
+        self.file_mode = None
+        self.dir_mode = None
+        atexit.register(self.flush)
+
+    def prepare(self):
+        # directories are created on first use, so importing this module has no side effects
+        if self.file_mode is not None:
+            return
+        with self.counter_lock:
+            if self.file_mode is not None:
+                return
+            created = []
+            for path in [self.path, self.lock_path]:
+                if not os.path.exists(path):
+                    try:
+                        os.makedirs(path)
+                        created.append(path)
+                    except FileExistsError:
+                        pass
+            umask = self.umask()
+            self.dir_mode = (0o777 & ~umask) | 0o2070
+            self.file_mode = (0o666 & ~umask) | 0o060
+            for path in created:
+                self.chmod(path, self.dir_mode)
+
+    def umask(self):
+        # read the umask from a probe file instead of resetting it for the whole process
+        probe = os.path.join(self.path, ".umask-%d-%d" % (os.getpid(), threading.current_thread().ident))
+        fd = os.open(probe, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o777)
+        try:
+            umask = 0o777 & ~os.fstat(fd).st_mode
+        finally:
+            os.close(fd)
+            os.remove(probe)
+        return umask
+
+    def chmod(self, file_name, mode):
+        # pages and locks are group-writable so that users sharing the cache can reuse them
+        try:
+            os.chmod(file_name, mode)
+        except OSError:
+            pass
+
+    def lock(self, name, blocking=True):
+        self.prepare()
+        lock_name = os.path.join(self.lock_path, name + ".lock")
+        fd = os.open(lock_name, os.O_RDWR | os.O_CREAT, self.file_mode)
+        lock_file = os.fdopen(fd, "a")
+        self.chmod(lock_name, self.file_mode)
+        if fcntl is not None:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file, flags)
+            except (IOError, OSError):
+                lock_file.close()
+                return None
+        return lock_file
+
+    def unlock(self, lock_file):
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    def load(self, name, fetch):
+        # only one worker per entry fetches the page, the others wait and read it
+        cache_file = os.path.join(self.path, name)
+        lock_file = self.lock(name)
+        try:
+            if os.path.exists(cache_file):
+                self.record(hits=1)
+                try:
+                    os.utime(cache_file, None)
+                except OSError:
+                    # pages owned by another user can't be touched, they simply age faster
+                    pass
+            else:
+                self.record(misses=1)
+                fd, temp_file = tempfile.mkstemp(suffix=self.TEMP_SUFFIX, dir=self.path)
+                os.close(fd)
+                try:
+                    fetch(temp_file)
+                    self.chmod(temp_file, self.file_mode)
+                    os.replace(temp_file, cache_file)
+                finally:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+            with open(cache_file, "rb") as fin:
+                page = fin.read()
+        finally:
+            self.unlock(lock_file)
+
+        if self.max_size is not None:
+            self.evict(self.max_size, keep=name)
+        return page
+
+    def names(self):
+        if not os.path.exists(self.path):
+            return []
+        return [name for name in os.listdir(self.path) if name != self.LOCK_DIR and not name.startswith(".umask-")]
+
+    def entries(self):
+        entries = []
+        for name in self.names():
+            if name.endswith(self.TEMP_SUFFIX):
+                continue
+            try:
+                info = os.stat(os.path.join(self.path, name))
+            except FileNotFoundError:
+                # evicted by another worker in the meantime
+                continue
+            if S_ISREG(info.st_mode):
+                entries.append((info.st_mtime, info.st_size, name))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def remove(self, name):
+        lock_file = self.lock(name, blocking=False)
+        if lock_file is None:
+            return False
+        try:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+        finally:
+            self.unlock(lock_file)
+        return True
+
+    def evict(self, max_size, keep=None):
+        # least recently used first, entries held by other workers are skipped
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        count = 0
+        for _, size, name in entries:
+            if total <= max_size:
+                break
+            if name == keep:
+                continue
+            if self.remove(name):
+                total -= size
+                count += 1
+        self.record(evictions=count)
+        if count:
+            self.logger.info("Evicted %d cached pages" % count)
+        return count
+
+    def verify(self, fix=False):
+        invalid = []
+        for name in self.names():
+            file_name = os.path.join(self.path, name)
+            try:
+                if os.path.isdir(file_name):
+                    continue
+                if name.endswith(self.TEMP_SUFFIX):
+                    # leftover of a crashed worker
+                    if time.time() - os.path.getmtime(file_name) > 3600:
+                        invalid.append(name)
+                    continue
+                with open(file_name, "rb") as fin:
+                    page = fin.read()
+            except FileNotFoundError:
+                continue
+            try:
+                page = page.decode("utf-8")
+            except UnicodeDecodeError:
+                invalid.append(name)
+                continue
+            if not page.strip():
+                invalid.append(name)
+        if fix:
+            for name in invalid:
+                self.remove(name)
+        return invalid
+
+    def record(self, hits=0, misses=0, evictions=0):
+        with self.counter_lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+            self.pending["hits"] += hits
+            self.pending["misses"] += misses
+            self.pending["evictions"] += evictions
+
+    def flush(self):
+        # lifetime counters shared by all workers on this cache, written in batches
+        with self.counter_lock:
+            pending = self.pending
+            self.pending = {"hits": 0, "misses": 0, "evictions": 0}
+        if not any(pending.values()):
+            return
+        try:
+            lock_file = self.lock(self.STATS_FILE)
+        except OSError:
+            self.logger.warning("Can't save statistics of %s" % self.path)
+            return
+        try:
+            counters = self.load_stats()
+            for key in pending:
+                counters[key] += pending[key]
+            fd, temp_file = tempfile.mkstemp(suffix=self.TEMP_SUFFIX, dir=self.lock_path)
+            with os.fdopen(fd, "w") as fout:
+                json.dump(counters, fout)
+            self.chmod(temp_file, self.file_mode)
+            os.replace(temp_file, self.stats_file)
+        finally:
+            self.unlock(lock_file)
+
+    def load_stats(self):
+        counters = {"hits": 0, "misses": 0, "evictions": 0}
+        if os.path.exists(self.stats_file):
+            try:
+                with open(self.stats_file, "r") as fin:
+                    counters.update(json.load(fin))
+            except ValueError:
+                self.logger.warning("Reset corrupted cache statistics")
+        return counters
+
+    def stats(self):
+        self.flush()
+        entries = self.entries()
+        stats = self.load_stats()
+        stats["entries"] = len(entries)
+        stats["size"] = sum(size for _, size, _ in entries)
+        return stats
+
+
+default_cache = PageCache(max_size=PageCache.MAX_SIZE)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Inspect and maintain the page cache.")
+    parser.add_argument("command", choices=["stats", "verify", "prune"])
+    parser.add_argument("--path", default="cache/")
+    parser.add_argument("--max-size", type=int, default=None, help="size budget in bytes for prune")
+    args = parser.parse_args()
+
+    cache = PageCache(args.path)
+    if args.command == "stats":
+        stats = cache.stats()
+        print("%d cached pages, %d bytes" % (stats["entries"], stats["size"]))
+        print("%d hits, %d misses, %d evictions" % (stats["hits"], stats["misses"], stats["evictions"]))
+    elif args.command == "verify":
+        invalid = cache.verify()
+        for name in invalid:
+            print("Invalid: %s" % name)
+        print("%d invalid cached pages" % len(invalid))
+        sys.exit(1 if invalid else 0)
+    elif args.command == "prune":
+        invalid = cache.verify(fix=True)
+        print("Removed %d invalid cached pages" % len(invalid))
+        if args.max_size is not None:
+            cache.evict(args.max_size)
+        cache.flush()
@@ -1,12 +1,17 @@
 from __future__ import print_function
 
-import os
 import re
+import html
+import logging
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from six.moves import urllib
 
 from format import Formatter
+from cache import PageCache, default_cache
+from matcher import KeywordMatcher
+from scheduler import default_scheduler
 
 
 this_year = datetime.now().year
@@ -30,15 +35,18 @@ MONTHS = {
 
 class Conference(Formatter):
 
-    def __init__(self, venue, pattern, key_patterns, cache="cache/"):
+    HTML_TAG = re.compile("<[^>]*>")
+
+    def __init__(self, venue, pattern, key_patterns, cache=None, scheduler=None):
         super(Conference, self).__init__()
         self.venue = venue
         self.pattern = pattern
         self.key_patterns = key_patterns
-        self.cache = cache
+        self.cache = cache or default_cache
+        self.scheduler = scheduler or default_scheduler
 
-        if not os.path.exists(self.cache):
-            os.mkdir(self.cache)
+        if isinstance(self.cache, str):
+            self.cache = PageCache(self.cache)
         if isinstance(self.pattern, str):
             self.pattern = re.compile(self.pattern, re.DOTALL)
         for key in self.key_patterns:
@@ -49,34 +57,38 @@ class Conference(Formatter):
     def extract(self, keywords=None, year=None):
         year = year or this_year
 
-        cache_file = os.path.join(self.cache, "%s_%d.html" % (self.venue, year))
-        if not os.path.exists(cache_file):
-            url = self.get_url(year)
-            try:
-                urllib.request.urlretrieve(url, cache_file)
-            except urllib.error.URLError:
-                self.logger.warning("Can't retrieve %s %d" % (self.venue, year))
-                return []
+        url = self.get_url(year)
+        retrieved = []
+
+        def fetch(file_name):
+            # only called by the cache on a miss
+            self.scheduler.submit(url, urllib.request.urlretrieve, url, file_name).result()
+            retrieved.append(file_name)
+
+        try:
+            page = self.cache.load("%s_%d.html" % (self.venue, year), fetch)
+        except urllib.error.URLError:
+            self.logger.warning("Can't retrieve %s %d" % (self.venue, year))
+            return []
+        if retrieved:
             self.logger.info("Retrieved %s %d" % (self.venue, year))
         else:
             self.logger.info("Load cached %s %d" % (self.venue, year))
-
-        with open(cache_file, "rb") as fin:
-            page = fin.read()
         page = page.decode("utf-8")
 
-        if isinstance(keywords, str):
-            keywords = [keywords]
-        if isinstance(keywords, list):
-            keywords = re.compile("[> ](?:%s)[ <]" % "|".join(keywords), re.DOTALL | re.IGNORECASE)
+        if keywords is not None and not isinstance(keywords, KeywordMatcher):
+            keywords = KeywordMatcher(keywords)
 
         papers = []
         for match in self.pattern.finditer(page):
             paragraph = match.group(0)
+            paper = defaultdict(list)
             if keywords is not None:
-                if not keywords.search(paragraph):
+                # only match the text content, not tag names or links
+                matched = keywords.match(html.unescape(self.HTML_TAG.sub(" ", paragraph)))
+                if not matched:
                     continue
-            paper = defaultdict(list)
+                paper["keywords"] = matched
             paper["venue"] = self.venue
             paper["year"] = year
             for key, pattern in self.key_patterns.items():
@@ -306,8 +318,34 @@ class Conferences(object):
         papers = []
         start = start or this_year
         end = end or this_year
+        if keywords is not None and not isinstance(keywords, KeywordMatcher):
+            keywords = KeywordMatcher(keywords)
+        caches = list({id(conference.cache): conference.cache for conference in self.conferences}.values())
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        # one worker per host, so venues on a slow host never hold up the other hosts
+        tasks = defaultdict(list)
+        for year in range(start, end+1):
+            for conference in self.conferences:
+                host = urllib.parse.urlparse(conference.get_url(year)).netloc
+                tasks[host].append((conference, year))
+        with ThreadPoolExecutor(max_workers=max(len(tasks), 1)) as executor:
+            results = {}
+            for host_tasks in tasks.values():
+                results[executor.submit(self.extract_host, keywords, host_tasks)] = host_tasks
+            papers_by_task = {}
+            for result, host_tasks in results.items():
+                papers_by_task.update(zip(host_tasks, result.result()))
         for year in range(start, end+1):
             for conference in self.conferences:
-                papers += conference.extract(keywords, year)
+                papers += papers_by_task[(conference, year)]
+
+        hits = sum(cache.hits for cache in caches) - hits
+        misses = sum(cache.misses for cache in caches) - misses
+        for cache in caches:
+            cache.flush()
+        logging.getLogger(__name__).info("Page cache: %d hits, %d misses" % (hits, misses))
+        return papers
 
-        return papers
\ No newline at end of file
+    def extract_host(self, keywords, tasks):
+        return [conference.extract(keywords, year) for conference, year in tasks]
\ No newline at end of file
@@ -37,6 +37,11 @@ class Formatter(object):
         new_title = " ".join(new_tokens)
         return new_title
 
+    def keywords_format(self, keywords):
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        return keywords
+
     def year_format(self, year):
         if isinstance(year, list):
             year = year[0]
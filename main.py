@@ -16,13 +16,13 @@ if __name__ == "__main__":
     # papers += source.extract(["graph convolution", "knowledge graph", "embedding", "reasoning"], 2018)
 
     # Search missing links in Google Scholar
-    for paper in papers:
-        if "pdf" not in paper:
-            print(paper)
-            results = engine.search(paper["title"])
-            if results:
-                print(results[0])
-                paper["pdf"] = results[0]["pdf"]
+    requests = [(paper, engine.submit(paper["title"])) for paper in papers if "pdf" not in paper]
+    for paper, request in requests:
+        print(paper)
+        results = request.result()
+        if results:
+            print(results[0])
+            paper["pdf"] = results[0]["pdf"]
 
     builder = build.Builder(
         title="Literature of Deep Learning for Graphs",
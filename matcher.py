@@ -0,0 +1,99 @@
+from __future__ import print_function
+
+from collections import deque
+
+
+class KeywordMatcher(object):
+
+    def __init__(self, keywords):
+        # keywords can be a string, a list, or a dict mapping each keyword to its synonyms
+        # they are matched as literal terms, not as regular expressions
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        if not isinstance(keywords, dict):
+            keywords = {keyword: [] for keyword in keywords}
+        self.keywords = keywords
+
+        # Aho-Corasick automaton over case-folded, whitespace-normalized keywords
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for keyword, synonyms in self.keywords.items():
+            for term in [keyword] + list(synonyms):
+                self.add(term, keyword)
+        self.build()
+
+    def normalize(self, term):
+        return " ".join(term.casefold().split())
+
+    def add(self, term, keyword):
+        term = self.normalize(term)
+        if not term:
+            return
+        state = 0
+        for char in term:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append((len(term), keyword))
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                fail = self.goto[fail].get(char, 0)
+                self.fail[next_state] = fail
+                self.output[next_state] = self.output[next_state] + self.output[fail]
+                queue.append(next_state)
+
+    def is_word(self, char):
+        return char.isalnum() or char == "_"
+
+    def finditer(self, text):
+        state = 0
+        # offsets of the folded characters in the original text
+        offsets = []
+        last_space = False
+        for i, char in enumerate(text):
+            if char.isspace():
+                if last_space:
+                    continue
+                last_space = True
+                folded = " "
+            else:
+                last_space = False
+                folded = char.casefold()
+            end = i + 1
+            word_end = end == len(text) or not self.is_word(text[end])
+            for fold_char in folded:
+                offsets.append(i)
+                while state and fold_char not in self.goto[state]:
+                    state = self.fail[state]
+                state = self.goto[state].get(fold_char, 0)
+                if not word_end:
+                    continue
+                for length, keyword in self.output[state]:
+                    start = offsets[len(offsets) - length]
+                    if start == 0 or not self.is_word(text[start - 1]):
+                        yield start, end, keyword
+
+    def search(self, text):
+        for _ in self.finditer(text):
+            return True
+        return False
+
+    def match(self, text):
+        keywords = []
+        found = set()
+        for _, _, keyword in self.finditer(text):
+            if keyword not in found:
+                found.add(keyword)
+                keywords.append(keyword)
+        return keywords
@@ -0,0 +1,196 @@
+from __future__ import print_function
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_tz, mktime_tz
+from six.moves import urllib
+
+
+class Throttled(Exception):
+
+    def __init__(self, message="", retry_after=None):
+        super(Throttled, self).__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket(object):
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_update = time.time()
+        self.blocked_until = 0
+        self.failures = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_update) * self.rate)
+        self.last_update = now
+
+    def next_time(self, now):
+        self.refill(now)
+        ready = now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+        return max(ready, self.blocked_until)
+
+    def consume(self, now):
+        self.refill(now)
+        self.tokens -= 1
+
+    def backoff(self, now, retry_after=None, max_delay=600):
+        self.failures += 1
+        if retry_after is None:
+            retry_after = min(max_delay, 2 ** self.failures / self.rate)
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        self.tokens = min(self.tokens, 0)
+        return retry_after
+
+    def succeed(self):
+        self.failures = 0
+
+
+class Scheduler(object):
+
+    RATE = 1
+    BURST = 1
+    MAX_RETRIES = 5
+    RETRY_CODES = {429, 503}
+
+    def __init__(self, rate=None, burst=None, max_retries=None):
+        self.rate = rate or self.RATE
+        self.burst = burst or self.BURST
+        self.max_retries = self.MAX_RETRIES if max_retries is None else max_retries
+        self.logger = logging.getLogger("%s.%s" % (self.__module__, self.__class__.__name__))
+        self.buckets = {}
+        self.queues = {}
+        self.executors = {}
+        self.running = {}
+        self.condition = threading.Condition()
+        self.dispatcher = None
+
+    def set_rate(self, host, rate, burst=1):
+        with self.condition:
+            self.buckets[host] = TokenBucket(rate, burst)
+            executor = self.executors.pop(host, None)
+            self.condition.notify()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def submit(self, url, func, *args, **kwargs):
+        host = urllib.parse.urlparse(url).netloc
+        future = Future()
+        with self.condition:
+            self.start()
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            self.running.setdefault(host, 0)
+            self.queues.setdefault(host, deque()).append((future, func, args, kwargs, 0))
+            self.condition.notify()
+        return future
+
+    def start(self):
+        if self.dispatcher is None:
+            self.dispatcher = threading.Thread(target=self.dispatch)
+            self.dispatcher.daemon = True
+            self.dispatcher.start()
+
+    def dispatch(self):
+        # each host has its own workers and bucket, so a slow host never stalls the others
+        with self.condition:
+            while True:
+                now = time.time()
+                timeout = None
+                for host, queue in self.queues.items():
+                    bucket = self.buckets[host]
+                    # at most burst requests per host are in flight, the next one waits for a free slot
+                    if not queue or self.running[host] >= bucket.burst:
+                        continue
+                    ready = bucket.next_time(now)
+                    if ready <= now:
+                        bucket.consume(now)
+                        if host not in self.executors:
+                            self.executors[host] = ThreadPoolExecutor(max_workers=bucket.burst)
+                        self.running[host] += 1
+                        self.executors[host].submit(self.run, host, *queue.popleft())
+                        ready = None
+                        if queue and self.running[host] < bucket.burst:
+                            ready = bucket.next_time(now)
+                    if ready is not None and (timeout is None or ready - now < timeout):
+                        timeout = max(ready - now, 0)
+                self.condition.wait(timeout)
+
+    def run(self, host, future, func, args, kwargs, num_retry):
+        try:
+            self.execute(host, future, func, args, kwargs, num_retry)
+        finally:
+            with self.condition:
+                self.running[host] -= 1
+                self.condition.notify()
+
+    def execute(self, host, future, func, args, kwargs, num_retry):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Throttled as e:
+            self.retry(host, future, func, args, kwargs, num_retry, e, e.retry_after)
+        except urllib.error.HTTPError as e:
+            if e.code in self.RETRY_CODES:
+                self.retry(host, future, func, args, kwargs, num_retry, e, self.retry_after(e))
+            else:
+                future.set_exception(e)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            with self.condition:
+                self.buckets[host].succeed()
+            future.set_result(result)
+
+    def retry(self, host, future, func, args, kwargs, num_retry, error, retry_after=None):
+        with self.condition:
+            delay = self.buckets[host].backoff(time.time(), retry_after)
+            give_up = num_retry >= self.max_retries
+            if not give_up:
+                self.logger.info("Throttled by %s, retry in %.1f seconds" % (host, delay))
+                # a retried task goes back in front of its host's queue, so it is not marked as running again
+                retry_future = Future()
+                retry_future.add_done_callback(lambda f: self.forward(f, future))
+                self.queues[host].appendleft((retry_future, func, args, kwargs, num_retry + 1))
+                self.condition.notify()
+        if give_up:
+            self.logger.warning("Give up %s after %d retries" % (host, num_retry))
+            future.set_exception(error)
+
+    def cancel(self, url, error):
+        # fail every queued task of the host, e.g. once it has banned us
+        host = urllib.parse.urlparse(url).netloc
+        with self.condition:
+            queue = self.queues.get(host, deque())
+            tasks = list(queue)
+            queue.clear()
+        for future, _, _, _, _ in tasks:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+        return len(tasks)
+
+    def forward(self, source, target):
+        if source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+    def retry_after(self, error):
+        value = error.headers.get("Retry-After") if error.headers else None
+        if not value:
+            return None
+        if value.strip().isdigit():
+            return int(value)
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(mktime_tz(date) - time.time(), 0)
+
+
+default_scheduler = Scheduler()
@@ -1,23 +1,26 @@
 from __future__ import print_function
 
 import re
-import pause
-import datetime
 from collections import defaultdict
+from concurrent.futures import Future
 from six.moves import urllib
 
 from format import Formatter
+from scheduler import Throttled, default_scheduler
 
 
-class SearchEngine(Formatter):
+class Banned(Exception):
+    pass
+
 
-    TIME_INTERVAL = 1
+class SearchEngine(Formatter):
 
-    def __init__(self, pattern, key_patterns):
+    def __init__(self, pattern, key_patterns, scheduler=None):
         super(SearchEngine, self).__init__()
         self.pattern = pattern
         self.key_patterns = key_patterns
-        self.last_request = datetime.datetime.now()
+        self.scheduler = scheduler or default_scheduler
+        self.banned = False
 
         if isinstance(self.pattern, str):
             self.pattern = re.compile(self.pattern, re.DOTALL)
@@ -26,10 +29,37 @@ class SearchEngine(Formatter):
             if isinstance(key_pattern, str):
                 self.key_patterns[key] = re.compile(key_pattern, re.DOTALL)
 
+    def submit(self, query, threshold=0):
+        future = Future()
+        if self.banned:
+            future.set_result([])
+            return future
+
+        def done(request):
+            try:
+                future.set_result(request.result())
+            except Banned:
+                future.set_result([])
+            except Throttled:
+                self.logger.warning("Throttled by %s" % self.__class__.__name__)
+                future.set_result([])
+            except urllib.error.URLError:
+                self.logger.warning("Can't access %s" % self.__class__.__name__)
+                future.set_result([])
+            except Exception as e:
+                future.set_exception(e)
+
+        url = self.get_url(query)
+        self.scheduler.submit(url, self.search_page, url, query, threshold).add_done_callback(done)
+        return future
+
     def search(self, query, threshold=0):
-        pause.until(self.last_request + datetime.timedelta(seconds=self.TIME_INTERVAL))
-        page = self.get_page(query)
-        self.last_request = datetime.datetime.now()
+        return self.submit(query, threshold).result()
+
+    def search_page(self, url, query, threshold=0):
+        if self.banned:
+            return []
+        page = self.get_page(url)
 
         if threshold > 0:
             tokens = "|".join(query.split())
@@ -56,16 +86,16 @@ class GoogleScholar(SearchEngine):
     HTML_TAG = re.compile("</?[^>]*>")
     BOT_CHECK = re.compile("Please show you&#39;re not a robot")
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         super(GoogleScholar, self).__init__(
             pattern='<div class="gs_r gs_or gs_scl".*?</svg></a></div></div></div>',
             key_patterns={
                 "title": "<a id=.*?>(.*?)</a>",
                 "year": '<div class="gs_a">.*?, (\d{4}).*?</div>',
                 "pdf": '<a href="([^"]*)".*?<span class=gs_ctg2>\[PDF\]</span>'
-            }
+            },
+            **kwargs
         )
-        self.banned = False
 
     def title_format(self, title):
         if isinstance(title, list):
@@ -74,12 +104,12 @@ class GoogleScholar(SearchEngine):
         title = super(GoogleScholar, self).title_format(title)
         return title
 
-    def get_page(self, query):
-        if self.banned:
-            return ""
-
+    def get_url(self, query):
         query = query.replace(" ", "+")
         url = "https://scholar.google.com/scholar?q=%s" % query
+        return url
+
+    def get_page(self, url):
         request = urllib.request.Request(
             url,
             headers={
@@ -88,15 +118,15 @@ class GoogleScholar(SearchEngine):
             }
         )
 
-        try:
-            with urllib.request.urlopen(request) as fin:
-                page = fin.read()
-            page = page.decode("utf-8")
-            if self.BOT_CHECK.search(page):
-                self.logger.warning("Ooops! Banned by Google Scholar")
-                self.banned = True
-        except urllib.error.URLError:
-            self.logger.warning("Can't access Google Scholar")
-            return ""
+        with urllib.request.urlopen(request) as fin:
+            page = fin.read()
+        page = page.decode("utf-8")
+        if self.BOT_CHECK.search(page):
+            # a ban is permanent, so the pending queries are dropped instead of retried
+            self.logger.warning("Ooops! Banned by Google Scholar")
+            self.banned = True
+            error = Banned("Banned by Google Scholar")
+            self.scheduler.cancel(url, error)
+            raise error
 
         return page
\ No newline at end of file
@@ -0,0 +1,107 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import threading
+import multiprocessing
+
+from cache import PageCache
+
+
+def fetch_page(file_name):
+    with open(file_name, "w") as fout:
+        fout.write("<html>%s</html>" % ("x" * 100))
+
+
+def fetch_counted(file_name):
+    # the count file is appended by every worker that really fetches
+    with open(os.path.join(os.path.dirname(file_name), "..", "fetches"), "a") as fout:
+        fout.write("1")
+    time.sleep(0.2)
+    fetch_page(file_name)
+
+
+def load_in_process(path):
+    PageCache(path).load("shared.html", fetch_counted)
+
+
+class PageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "cache")
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.flush()
+        shutil.rmtree(self.root)
+
+    def open(self, **kwargs):
+        cache = PageCache(self.path, **kwargs)
+        self.caches.append(cache)
+        return cache
+
+    def test_lazy_directory(self):
+        cache = self.open()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(cache.entries(), [])
+        cache.load("a.html", fetch_page)
+        self.assertTrue(os.path.exists(os.path.join(self.path, "a.html")))
+
+    def test_hits_and_misses(self):
+        cache = self.open()
+        page = cache.load("a.html", fetch_page)
+        self.assertEqual(cache.load("a.html", None), page)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertEqual(PageCache(self.path).stats()["misses"], 1)
+
+    def test_group_writable(self):
+        cache = self.open()
+        cache.load("a.html", fetch_page)
+        for file_name in [os.path.join(self.path, "a.html"), os.path.join(cache.lock_path, "a.html.lock")]:
+            self.assertEqual(os.stat(file_name).st_mode & 0o060, 0o060)
+
+    def test_eviction(self):
+        cache = self.open(max_size=250)
+        for name in ["a.html", "b.html", "c.html"]:
+            cache.load(name, fetch_page)
+        names = sorted(name for _, _, name in cache.entries())
+        self.assertEqual(names, ["b.html", "c.html"])
+        self.assertEqual(cache.evictions, 1)
+
+    def test_concurrent_eviction(self):
+        cache = self.open(max_size=1)
+        errors = []
+
+        def worker(index):
+            try:
+                for i in range(50):
+                    cache.load("%d_%d.html" % (index, i % 5), fetch_page)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(cache.hits + cache.misses, 400)
+
+    def test_single_fetch_across_processes(self):
+        pool = multiprocessing.Pool(4)
+        try:
+            pool.map(load_in_process, [self.path] * 4)
+        finally:
+            pool.close()
+            pool.join()
+        with open(os.path.join(self.root, "fetches")) as fin:
+            self.assertEqual(fin.read(), "1")
+        self.assertEqual(PageCache(self.path).verify(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()